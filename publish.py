@@ -4,20 +4,181 @@ Simple notebook publishing script for workshops.
 Processes notebooks with metadata and solution-tagged cells.
 """
 
+import argparse
+import contextlib
+import copy
+import dataclasses
+import functools
+import glob
+import hashlib
+import io
 import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-import zipfile
-from glob import glob
-import yaml
 import re
 import shutil
+import string
 import subprocess
 import sys
+import threading
+import traceback
 try:
-    import markdown
+    import orjson
 except ImportError:
-    print("Warning: 'markdown' package not installed. Install with: pip install markdown")
-    markdown = None
+    orjson = None
+
+logger = logging.getLogger('publish')
+
+# yaml and markdown (which drags in pygments for codehilite) are slow to
+# import, so defer them until something actually needs them
+@functools.lru_cache(maxsize=1)
+def _yaml():
+    import yaml
+    return yaml
+
+def _yaml_load(stream):
+    """yaml.safe_load, but through libyaml's C loader when it's available."""
+    yaml = _yaml()
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    return yaml.load(stream, Loader=loader)
+
+@functools.lru_cache(maxsize=1)
+def _markdown():
+    try:
+        import markdown
+        return markdown
+    except ImportError:
+        print("Warning: 'markdown' package not installed. Install with: pip install markdown")
+        return None
+
+@functools.lru_cache(maxsize=1)
+def _markdown_converter():
+    """A single python-markdown instance, shared across documents.
+
+    Constructing one loads every extension, so build it once per process
+    and reset() between conversions instead of paying that per document.
+    """
+    md = _markdown()
+    if md is None:
+        return None
+    return md.Markdown(extensions=['extra', 'codehilite', 'toc'])
+
+@functools.lru_cache(maxsize=1)
+def _markdown_it():
+    """A shared markdown-it-py renderer, noticeably faster than python-markdown."""
+    try:
+        from markdown_it import MarkdownIt
+    except ImportError:
+        return None
+    return MarkdownIt('commonmark', {'html': True}).enable(['table', 'strikethrough'])
+
+_HEADING_RE = re.compile(r'<h([1-6])>(.+?)</h\1>', re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+def _add_heading_ids(html):
+    """Give headings id attributes like python-markdown's toc extension does.
+
+    markdown-it-py doesn't anchor headings on its own, and the generated
+    tables of contents rely on those ids.
+    """
+    def _sub(m):
+        level, text = m.group(1), m.group(2)
+        return f'<h{level} id="{_slugify(_TAG_RE.sub("", text))}">{text}</h{level}>'
+    return _HEADING_RE.sub(_sub, html)
+
+def notebook_json_loads(data):
+    """Parse notebook JSON bytes, using orjson's C parser when available."""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps_compact(obj):
+    """Serialize small metadata blobs (manifests) to compact JSON bytes."""
+    if orjson:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+def load_notebook_json(path):
+    """Parse a notebook file, using orjson's C parser when available."""
+    return notebook_json_loads(Path(path).read_bytes())
+
+# Compact JSON halves the bytes written and skips the pretty-printer;
+# Jupyter reads either format. --pretty turns indentation back on
+_pretty_notebooks = False
+
+def write_notebook_json(notebook, path):
+    """Write a notebook file, using orjson's C serializer when available."""
+    if orjson:
+        option = orjson.OPT_INDENT_2 if _pretty_notebooks else 0
+        Path(path).write_bytes(orjson.dumps(notebook, option=option))
+    elif _pretty_notebooks:
+        Path(path).write_text(json.dumps(notebook, indent=1))
+    else:
+        # Serialize fully in memory so the write is one buffered call
+        # instead of json.dump's stream of tiny writes
+        Path(path).write_text(json.dumps(notebook, separators=(',', ':')))
+
+# Precompiled patterns - these run once per markdown cell, so compile them
+# a single time at import instead of paying re-compile/cache lookups per call
+_FRONTMATTER_RE = re.compile(r'^---\s*\n(.*?)\n---\s*\n(.*)$', re.DOTALL)
+_H2_RE = re.compile(r'^## (.+)$', re.MULTILINE)
+
+# {{ var }} placeholders in the configurable index template
+_TEMPLATE_VAR_RE = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+# Anchor slugs: drop punctuation (keeping - and _) and turn spaces into
+# hyphens, all in a single C-level translate pass
+_SLUG_TABLE = {ord(c): None for c in string.punctuation if c not in '-_'}
+_SLUG_TABLE[ord(' ')] = ord('-')
+
+def _slugify(text):
+    """Anchor slug for a heading, matching python-markdown's toc ids."""
+    return text.lower().translate(_SLUG_TABLE).strip('-')
+
+# File references - single alternation so one pass over the content finds
+# markdown links/images, HTML img tags, and (for markdown files) video sources
+_NOTEBOOK_REFS_RE = re.compile(
+    r'\[[^\]]*\]\((?P<md>[^)]+\.(?:pdf|png|jpg|jpeg|gif|svg))\)'  # Markdown links/images
+    r'|<img[^>]*?src=["\'](?P<img>[^"\']+\.(?:png|jpg|jpeg|gif|svg))["\']',  # HTML img tags
+    re.IGNORECASE)
+
+_MARKDOWN_REFS_RE = re.compile(
+    r'\[[^\]]*\]\((?P<md>[^)]+\.(?:pdf|png|jpg|jpeg|gif|svg|mp4|webm|mov))\)'  # Markdown links/images
+    r'|<img[^>]*?src=["\'](?P<img>[^"\']+\.(?:png|jpg|jpeg|gif|svg))["\']'  # HTML img tags
+    r'|<(?:source|video)[^>]*?src=["\'](?P<vid>[^"\']+\.(?:mp4|webm|mov))["\']',  # HTML video
+    re.IGNORECASE)
+
+def _fast_copy(src, dst):
+    """Copy a file into the output, preferring cheap same-filesystem tricks.
+
+    A hardlink is an O(1) metadata operation, and copy_file_range lets the
+    kernel (or a CoW filesystem) move the bytes without round-tripping them
+    through Python. Falls back to a plain shutil.copy2 when neither works.
+    """
+    try:
+        os.link(src, dst)
+        return
+    except OSError:
+        pass
+    try:
+        with open(src, 'rb') as s, open(dst, 'wb') as d:
+            remaining = os.fstat(s.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(s.fileno(), d.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        return
+    except (AttributeError, OSError):
+        pass
+    shutil.copy2(src, dst)
+
+def _find_references(pattern, content):
+    """Yield every file reference a single scan of the content turns up."""
+    for m in pattern.finditer(content):
+        yield m.group(m.lastgroup)
 
 def get_notebook_metadata(notebook):
     """Extract workshop metadata from notebook."""
@@ -25,14 +186,17 @@ def get_notebook_metadata(notebook):
 
 def extract_markdown_frontmatter(content):
     """Extract YAML frontmatter from markdown content."""
-    pattern = r'^---\s*\n(.*?)\n---\s*\n(.*)$'
-    match = re.match(pattern, content, re.DOTALL)
-    
+    # Cheap check first: most files without frontmatter don't start with ---
+    if not content.startswith('---'):
+        return {}, content
+
+    match = _FRONTMATTER_RE.match(content)
+
     if match:
         yaml_content = match.group(1)
         markdown_content = match.group(2)
         try:
-            frontmatter = yaml.safe_load(yaml_content)
+            frontmatter = _yaml_load(yaml_content)
             return frontmatter, markdown_content
         except:
             print(f"Warning: Invalid YAML frontmatter")
@@ -42,8 +206,7 @@ def extract_markdown_frontmatter(content):
 def generate_toc_from_markdown(markdown_content, has_useful_links=False):
     """Generate a table of contents from second-level headers (##) in markdown content."""
     # Find all second-level headers
-    header_pattern = r'^## (.+)$'
-    headers = re.findall(header_pattern, markdown_content, re.MULTILINE)
+    headers = _H2_RE.findall(markdown_content)
     
     # Add Useful Links to the beginning if it exists
     if has_useful_links:
@@ -56,27 +219,20 @@ def generate_toc_from_markdown(markdown_content, has_useful_links=False):
     toc_lines = ["## Table of Contents\n"]
     for header in headers:
         # Create anchor link - remove special characters and convert spaces to hyphens
-        anchor = re.sub(r'[^\w\s-]', '', header).strip().lower().replace(' ', '-')
-        toc_lines.append(f"- [{header}](#{anchor})")
+        toc_lines.append(f"- [{header}](#{_slugify(header)})")
     
     return "\n".join(toc_lines) + "\n"
 
-def markdown_to_html(content, title=""):
-    """Convert markdown to HTML with basic styling."""
-    if markdown:
-        html_content = markdown.markdown(content, extensions=['extra', 'codehilite', 'toc'])
-    else:
-        # Fallback: just wrap in pre tags if markdown not available
-        html_content = f"<pre>{content}</pre>"
-    
-    return f"""<!DOCTYPE html>
+# Page shell shared by every generated page - built once so each page
+# render is a single substitution instead of re-parsing a 3 KB f-string
+_PAGE_TEMPLATE = string.Template("""<!DOCTYPE html>
 <html>
 <head>
     <meta charset="utf-8">
     <meta name="viewport" content="width=device-width, initial-scale=1">
-    <title>{title}</title>
+    <title>$title</title>
     <style>
-        body {{
+        body {
             max-width: 800px;
             margin: 40px auto;
             padding: 0 20px;
@@ -85,9 +241,9 @@ def markdown_to_html(content, title=""):
             color: #333;
             font-size: 16px;
             padding-bottom: 5em;
-        }}
-        h1, h3, h4 {{ margin-top: 2em; }}
-        h2 {{
+        }
+        h1, h3, h4 { margin-top: 2em; }
+        h2 {
             position: sticky;
             top: 0;
             background: white;
@@ -95,82 +251,82 @@ def markdown_to_html(content, title=""):
             padding-bottom: 0.5em;
             z-index: 100;
             border-bottom: 2px solid #eee;
-        }}
+        }
         /* Give the first h2 (Table of Contents) less top margin */
-        h2:first-of-type {{
+        h2:first-of-type {
             margin-top: 1em;
             padding-top: 1em;
-        }}
-        h3 a {{
+        }
+        h3 a {
             text-decoration: none;
-        }}
-        h3 a:hover {{
+        }
+        h3 a:hover {
             text-decoration: underline;
-        }}
-        p {{
+        }
+        p {
             margin: 1em 0;
-        }}
-        code {{ 
+        }
+        code { 
             background: #f4f4f4; 
             padding: 2px 4px; 
             border-radius: 3px;
             font-family: Consolas, Monaco, monospace;
-        }}
-        pre {{ 
+        }
+        pre { 
             background: #f4f4f4; 
             padding: 1em; 
             border-radius: 5px; 
             overflow-x: auto;
-        }}
-        pre code {{ background: none; padding: 0; }}
-        a {{ color: #0066cc; }}
-        img {{
+        }
+        pre code { background: none; padding: 0; }
+        a { color: #0066cc; }
+        img {
             display: block;
             max-width: 80%;
             height: auto;
             margin: 1em auto;
             border: solid 1px #999;
-        }}
-        blockquote {{
+        }
+        blockquote {
             border-left: solid lightblue 20px;
             margin-left: 4em;
             padding-left: 1em;
             color: #999;
-        }}
-        video {{
+        }
+        video {
             display: block;
             max-width: 80%;
             height: auto;
             margin: 1em auto;
             border: solid 1px #999;
-        }}
-        .download-box {{
+        }
+        .download-box {
             background: #e8f4f8;
             padding: 1em;
             border-radius: 5px;
             margin: 1em 0;
-        }}
-        ul {{
+        }
+        ul {
             list-style-type: disc;
             padding-left: 2em;
             margin: 0.5em 0;
-        }}
-        li {{
+        }
+        li {
             margin: 0.3em 0;
-        }}
-        .section-header {{
+        }
+        .section-header {
             margin-top: 2em;
             margin-bottom: 1em;
             padding-bottom: 0.5em;
             border-bottom: 2px solid #eee;
-        }}
-        .resource-buttons {{
+        }
+        .resource-buttons {
             margin: 1em 0;
             display: flex;
             flex-wrap: wrap;
             gap: 0.5em;
-        }}
-        .resource-button {{
+        }
+        .resource-button {
             display: inline-block;
             padding: 0.4em 0.8em;
             background: #f0f0f0;
@@ -180,54 +336,95 @@ def markdown_to_html(content, title=""):
             color: #333;
             font-size: 0.9em;
             transition: all 0.2s;
-        }}
-        .resource-button:hover {{
+        }
+        .resource-button:hover {
             background: #e0e0e0;
             border-color: #ccc;
-        }}
-        .resource-button.primary {{
+        }
+        .resource-button.primary {
             background: #e3f2fd;
             color: #1565c0;
             border-color: #90caf9;
-        }}
-        .resource-button.primary:hover {{
+        }
+        .resource-button.primary:hover {
             background: #bbdefb;
             border-color: #64b5f6;
-        }}
-        .resource-button.completed {{
+        }
+        .resource-button.completed {
             background: #e8f5e9;
             color: #2e7d32;
             border-color: #a5d6a7;
-        }}
-        .resource-button.completed:hover {{
+        }
+        .resource-button.completed:hover {
             background: #c8e6c9;
             border-color: #81c784;
-        }}
-        .data-download {{
+        }
+        .data-download {
             margin: 0.5em 0;
             font-size: 0.9em;
-        }}
-        .download-links {{
+        }
+        .download-links {
             margin: 0.5em 0;
             line-height: 1.8;
-        }}
-        .download-links a {{
+        }
+        .download-links a {
             color: #1976d2;
             text-decoration: none;
-        }}
-        .download-links a:hover {{
+        }
+        .download-links a:hover {
             text-decoration: underline;
-        }}
-        p:last {{
+        }
+        p:last {
             margin-bottom: 0;
             margin-top: 5em;
-        }}
+        }
     </style>
 </head>
 <body>
-{html_content}
+$body
 </body>
-</html>"""
+</html>""")
+
+# Cache of rendered pages so unchanged markdown skips re-parsing on re-runs;
+# the in-process memo spares even the disk read for repeats within one run
+_MD_CACHE_DIR = Path('.cache/md_html')
+_md_cache_enabled = True
+_md_memo = {}
+
+def markdown_to_html_fragment(content):
+    """Render markdown to body HTML, without the page shell."""
+    md_it = _markdown_it()
+    if md_it:
+        return _add_heading_ids(md_it.render(content))
+    converter = _markdown_converter()
+    if converter:
+        return converter.reset().convert(content)
+    # Fallback: just wrap in pre tags if markdown not available
+    return f"<pre>{content}</pre>"
+
+def markdown_to_html(content, title=""):
+    """Convert markdown to HTML with basic styling."""
+    if _md_cache_enabled:
+        key = hashlib.sha256(f"{title}\0{content}".encode()).hexdigest()
+        page = _md_memo.get(key)
+        if page is not None:
+            return page
+        cached = _MD_CACHE_DIR / f"{key}.html"
+        if cached.exists():
+            page = _md_memo[key] = cached.read_text()
+            return page
+
+    page = _PAGE_TEMPLATE.substitute(title=title, body=markdown_to_html_fragment(content))
+
+    if _md_cache_enabled:
+        # Write atomically so an interrupted run can't leave a partial page
+        _MD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = cached.with_suffix('.tmp')
+        tmp.write_text(page)
+        tmp.replace(cached)
+        _md_memo[key] = page
+
+    return page
 
 def load_config():
     """Load workshop configuration from YAML file."""
@@ -243,73 +440,78 @@ def load_config():
         }
     
     with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
+        return _yaml_load(f)
+
+@functools.lru_cache(maxsize=None)
+def _setup_cell_source(zip_name, github_repo, github_branch, output_dir, packages):
+    """Render setup-cell source once per unique configuration."""
+    body = ""
 
-def create_setup_cell(zip_name, config, install_packages="pandas natural_pdf tqdm"):
-    """Create setup cell that works in Colab, Jupyter, etc."""
-    github_repo = config['github_repo']
-    github_branch = config.get('github_branch', 'main')
-    output_dir = config.get('output_dir', 'docs')
-    
-    source_lines = []
-    
     # Handle package installation first
-    if install_packages:
-        source_lines.append("# Install required packages\n")
-        if isinstance(install_packages, str):
-            # If it's a string, split it into a list
-            packages = install_packages.split()
-        elif isinstance(install_packages, list):
-            packages = install_packages
-        else:
-            packages = []
-            
-        # Install each package separately
-        for package in packages:
-            if package.strip():  # Only if package name is not empty
-                source_lines.append(f"!pip install --upgrade --quiet {package.strip()}\n")
-        source_lines.append("\n")
-    
-    # Only add imports if we have a zip file to download
-    if zip_name:
-        source_lines.extend([
-            "import os\n",
-            "import urllib.request\n",
-            "import zipfile\n",
-            "\n",
-        ])
-    
-    # Only add download/extract code if we have a zip file
+    if packages:
+        pip_lines = "".join(f"!pip install --upgrade --quiet {p}\n" for p in packages)
+        body += f"# Install required packages\n{pip_lines}\n"
+
+    # Only add imports and download/extract code if we have a zip file
     if zip_name:
-        source_lines.extend([
-            "# Download and extract data files\n",
-            f"url = 'https://github.com/{github_repo}/raw/{github_branch}/{output_dir}/{zip_name}'\n",
-            "print(f'Downloading data from {url}...')\n",
-            f"urllib.request.urlretrieve(url, '{zip_name}')\n",
-            "\n",
-            f"print('Extracting {zip_name}...')\n",
-            f"with zipfile.ZipFile('{zip_name}', 'r') as zip_ref:\n",
-            "    zip_ref.extractall('.')\n",
-            "\n",
-            f"os.remove('{zip_name}')\n",
+        body += (
+            "import os\n"
+            "import urllib.request\n"
+            "import zipfile\n"
+            "\n"
+            "# Download and extract data files\n"
+            f"url = 'https://github.com/{github_repo}/raw/{github_branch}/{output_dir}/{zip_name}'\n"
+            "print(f'Downloading data from {url}...')\n"
+            f"urllib.request.urlretrieve(url, '{zip_name}')\n"
+            "\n"
+            f"print('Extracting {zip_name}...')\n"
+            f"with zipfile.ZipFile('{zip_name}', 'r') as zip_ref:\n"
+            "    zip_ref.extractall('.')\n"
+            "\n"
+            f"os.remove('{zip_name}')\n"
             "print('✓ Data files extracted!')"
-        ])
+        )
     else:
-        source_lines.append("print('✓ Packages installed!')")
-    
+        body += "print('✓ Packages installed!')"
+
+    # ipynb wants a list of lines, each keeping its trailing newline
+    return tuple(body.splitlines(keepends=True))
+
+def create_setup_cell(zip_name, config, install_packages="pandas natural_pdf tqdm"):
+    """Create setup cell that works in Colab, Jupyter, etc."""
+    if isinstance(install_packages, str):
+        # If it's a string, split it into a list
+        packages = tuple(install_packages.split())
+    elif isinstance(install_packages, list):
+        packages = tuple(p.strip() for p in install_packages if p.strip())
+    else:
+        packages = ()
+
+    source = _setup_cell_source(zip_name, config['github_repo'],
+                                config.get('github_branch', 'main'),
+                                config.get('output_dir', 'docs'), packages)
+
     return {
         "cell_type": "code",
         "metadata": {},
-        "source": source_lines,
+        "source": list(source),
         "execution_count": None,
         "outputs": []
     }
 
 def process_notebook(notebook_path, output_dir, config, section_slides=None):
     """Process a single notebook and return info for index."""
-    with open(notebook_path, 'r') as f:
-        notebook = json.load(f)
-    
+    # Fast negative filter: if the raw bytes never mention "workshop" the
+    # notebook can't carry workshop metadata, so skip it without parsing
+    # megabytes of embedded outputs. A bytes scan runs at memchr speed;
+    # the parsed-metadata check below stays the source of truth.
+    raw = Path(notebook_path).read_bytes()
+    if b'"workshop"' not in raw:
+        print(f"Skipping {notebook_path} - no workshop metadata")
+        return None
+
+    notebook = notebook_json_loads(raw)
+
     metadata = get_notebook_metadata(notebook)
     if not metadata:
         print(f"Skipping {notebook_path} - no workshop metadata")
@@ -334,25 +536,26 @@ def process_notebook(notebook_path, output_dir, config, section_slides=None):
     complete_nb['metadata']['kernelspec']['display_name'] = 'Python 3'
     complete_nb['metadata']['kernelspec']['language'] = 'python'
     
-    # Create exercise version
-    exercise_nb = json.loads(json.dumps(complete_nb))  # Deep copy
-    
-    # Process cells for exercise version
-    for i, cell in enumerate(exercise_nb['cells']):
-        # Clear outputs for all code cells (keep the source code)
-        if cell['cell_type'] == 'code':
-            cell['outputs'] = []
-            cell['execution_count'] = None
-        
-        # Replace solution-tagged cells with empty cells
-        if cell.get('metadata', {}).get('tags') and 'solution' in cell['metadata']['tags']:
-            exercise_nb['cells'][i] = {
+    # Create exercise version - copy structurally instead of round-tripping
+    # the whole notebook (with embedded image outputs) through json
+    exercise_nb = {**complete_nb, 'metadata': copy.deepcopy(complete_nb['metadata'])}
+    exercise_nb['cells'] = []
+
+    for cell in complete_nb['cells']:
+        if 'solution' in cell.get('metadata', {}).get('tags', []):
+            # Replace solution-tagged cells with empty cells
+            exercise_nb['cells'].append({
                 "cell_type": "code",
                 "metadata": {},
                 "source": [],
                 "execution_count": None,
                 "outputs": []
-            }
+            })
+        elif cell['cell_type'] == 'code':
+            # Clear outputs for code cells (keep the source code)
+            exercise_nb['cells'].append({**cell, 'outputs': [], 'execution_count': None})
+        else:
+            exercise_nb['cells'].append(cell)
     
     # Add setup cell if data files or install packages are specified
     if metadata.get('data_files') or metadata.get('install'):
@@ -372,8 +575,9 @@ def process_notebook(notebook_path, output_dir, config, section_slides=None):
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Copy any referenced files (PDFs, images) to output
-    find_and_copy_referenced_files(notebook, notebook_dir, output_dir)
+    # Copy any referenced files (PDFs, images) to output, keeping their
+    # (path, mtime, size) records so incremental runs notice edits
+    inputs = find_and_copy_referenced_files(notebook, notebook_dir, output_dir)
     
     # Handle slides if specified (item-specific or section-level)
     slide_file = metadata.get('slides')
@@ -400,6 +604,7 @@ def process_notebook(notebook_path, output_dir, config, section_slides=None):
                 dest_pdf.parent.mkdir(parents=True, exist_ok=True)
                 shutil.copy2(source_pdf, dest_pdf)
                 print(f"  → Copied slide file: {slide_file}")
+            _record_input(inputs, slide_file, source_pdf)
         else:
             print(f"\n❌ ERROR: Slide file not found: {slide_file}")
             print(f"   Looked in: {notebook_dir / slide_file}")
@@ -407,13 +612,11 @@ def process_notebook(notebook_path, output_dir, config, section_slides=None):
             sys.exit(1)
     
     # Exercise version keeps original name
-    with open(output_dir / f"{base_name}.ipynb", 'w') as f:
-        json.dump(exercise_nb, f, indent=1)
+    write_notebook_json(exercise_nb, output_dir / f"{base_name}.ipynb")
     print(f"✓ Created {output_dir / base_name}.ipynb")
-    
+
     # Complete version gets -ANSWERS suffix
-    with open(output_dir / f"{base_name}-ANSWERS.ipynb", 'w') as f:
-        json.dump(complete_nb, f, indent=1)
+    write_notebook_json(complete_nb, output_dir / f"{base_name}-ANSWERS.ipynb")
     print(f"✓ Created {output_dir / base_name}-ANSWERS.ipynb")
     
     # Return info for index
@@ -427,108 +630,203 @@ def process_notebook(notebook_path, output_dir, config, section_slides=None):
         'section': notebook_dir.name,
         'order': metadata.get('order', None),
         'links': metadata.get('links', None),
-        'slides': metadata.get('slides', None)
+        'slides': metadata.get('slides', None),
+        'inputs': inputs,
+        'data_patterns': metadata.get('data_files')
     }
 
+def _translate_segment(seg):
+    """Regex for one path component, with fnmatch-style [seq] classes."""
+    parts = []
+    i, n = 0, len(seg)
+    while i < n:
+        c = seg[i]
+        if c == '*':
+            parts.append('[^/]*')
+        elif c == '?':
+            parts.append('[^/]')
+        elif c == '[':
+            # Bracket parsing as in fnmatch.translate: '!' negates, and a
+            # ']' right after the opener (or the negation) is literal
+            j = i + 1
+            if j < n and seg[j] == '!':
+                j += 1
+            if j < n and seg[j] == ']':
+                j += 1
+            while j < n and seg[j] != ']':
+                j += 1
+            if j >= n:
+                parts.append('\\[')  # unterminated: a literal '['
+            else:
+                stuff = seg[i + 1:j].replace('\\', '\\\\')
+                if stuff.startswith('!'):
+                    stuff = '^' + stuff[1:]
+                elif stuff.startswith('^'):
+                    stuff = '\\' + stuff
+                parts.append(f'[{stuff}]')
+                i = j
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    return ''.join(parts)
+
+def _glob_pattern_re(pattern):
+    """Translate a glob-style pattern into a regex for relative paths.
+
+    Matches glob semantics: '*', '?' and '[seq]' stay within one path
+    component, and a bare '**' component recurses like glob(recursive=True).
+    """
+    segments = pattern.split('/')
+    last = len(segments) - 1
+    parts = []
+    for i, seg in enumerate(segments):
+        if seg == '**':
+            # '**/' crosses directory boundaries, like glob(recursive=True)
+            parts.append('(?:[^/]+/)*' if i < last else '.*')
+            continue
+        parts.append(_translate_segment(seg))
+        if i < last:
+            parts.append('/')
+    return re.compile(''.join(parts) + r'\Z')
+
 def create_data_zip(data_patterns, zip_path, base_dir):
     """Create a zip file with files matching the patterns, relative to base_dir."""
-    with zipfile.ZipFile(zip_path, 'w') as zipf:
-        added_files = set()
-        
-        for pattern in data_patterns:
-            # Resolve pattern relative to notebook directory
-            full_pattern = str(base_dir / pattern)
-            matches = glob(full_pattern, recursive=True)
-            
-            if not matches:
-                print(f"  Warning: No files match pattern '{pattern}' in {base_dir}")
-            
-            for file_path in matches:
-                file_path = Path(file_path)
-                # Calculate the archive name relative to the notebook's directory
-                try:
-                    arcname = file_path.relative_to(base_dir)
-                except ValueError:
-                    # If file is outside notebook dir, use full relative path
-                    arcname = file_path
-                
-                if str(file_path) not in added_files:
-                    zipf.write(file_path, str(arcname))
-                    added_files.add(str(file_path))
-        
-        print(f"✓ Created {zip_path.name} with {len(added_files)} files")
+    # Walk the tree once and match every pattern against the same listing,
+    # instead of letting glob re-walk the directory for each pattern
+    all_files = []
+    for root, dirs, files in os.walk(base_dir):
+        # Match glob's behavior: wildcards don't pick up hidden files
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        for name in files:
+            if not name.startswith('.'):
+                all_files.append(str((Path(root) / name).relative_to(base_dir)))
+
+    matched_files = []
+    seen = set()
+
+    for pattern in data_patterns:
+        if '..' in pattern.split('/'):
+            # The walk only covers base_dir's tree; patterns that reach
+            # outside it go through glob like they always did
+            matches = [Path(p) for p in
+                       glob.glob(str(base_dir / pattern), recursive=True)]
+        else:
+            pattern_re = _glob_pattern_re(pattern)
+            matches = [base_dir / f for f in all_files if pattern_re.match(f)]
+
+        if not matches:
+            print(f"  Warning: No files match pattern '{pattern}' in {base_dir}")
+
+        for file_path in matches:
+            key = str(file_path)
+            if key not in seen:
+                seen.add(key)
+                matched_files.append(file_path)
+
+    # Skip the rebuild entirely when the inputs haven't changed since the
+    # last run - the manifest records (path, mtime, size) for every file
+    manifest_path = zip_path.with_suffix('.manifest.json')
+    manifest = sorted(
+        [str(p), p.stat().st_mtime_ns, p.stat().st_size] for p in matched_files
+    )
+    if zip_path.exists() and manifest_path.exists():
+        try:
+            if notebook_json_loads(manifest_path.read_bytes()) == manifest:
+                print(f"✓ Reused {zip_path.name} ({len(matched_files)} files unchanged)")
+                return
+        except (ValueError, OSError):
+            pass
+
+    import zipfile
+    with zipfile.ZipFile(zip_path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=6) as zipf:
+        for file_path in matched_files:
+            # Calculate the archive name relative to the notebook's directory
+            try:
+                arcname = file_path.relative_to(base_dir)
+            except ValueError:
+                # If file is outside notebook dir, use full relative path
+                arcname = file_path
+
+            zipf.write(file_path, str(arcname))
+
+    tmp = manifest_path.with_suffix('.tmp')
+    tmp.write_bytes(_json_dumps_compact(manifest))
+    tmp.replace(manifest_path)
+
+    print(f"✓ Created {zip_path.name} with {len(matched_files)} files")
+
+def _record_input(records, rel_path, source):
+    """Remember a copied input's (path, mtime, size) for the reuse check."""
+    try:
+        st = os.stat(source)
+    except OSError:
+        return
+    records.append([str(rel_path), st.st_mtime_ns, st.st_size])
 
 def find_and_copy_referenced_files(notebook, notebook_dir, output_dir):
-    """Find files referenced in markdown cells and copy them to output."""
-    copied_files = []
-    
-    # Regex patterns for finding file references
-    patterns = [
-        r'\[.*?\]\(([^)]+\.(?:pdf|png|jpg|jpeg|gif|svg))\)',  # Markdown links
-        r'<img.*?src=["\']([^"\']+\.(?:png|jpg|jpeg|gif|svg))["\']',  # HTML img tags
-        r'!\[.*?\]\(([^)]+\.(?:png|jpg|jpeg|gif|svg))\)',  # Markdown images
-    ]
-    
+    """Find files referenced in markdown cells and copy them to output.
+
+    Returns the input records for every reference, so incremental runs
+    can tell when one of them changes.
+    """
+    # Collect every unique reference first - notebooks often repeat the
+    # same image across cells, and each attempt costs stat/mkdir syscalls
+    unique_refs = set()
+
     for cell in notebook.get('cells', []):
         if cell['cell_type'] == 'markdown':
             content = ''.join(cell.get('source', []))
-            
-            for pattern in patterns:
-                matches = re.findall(pattern, content, re.IGNORECASE)
-                for match in matches:
-                    # Skip URLs
-                    if match.startswith('http://') or match.startswith('https://'):
-                        continue
-                    
-                    # Resolve the file path relative to the notebook
-                    source_file = notebook_dir / match
-                    if source_file.exists():
-                        # Copy to output directory
-                        dest_file = output_dir / match
-                        dest_file.parent.mkdir(parents=True, exist_ok=True)
-                        
-                        if not dest_file.exists():
-                            shutil.copy2(source_file, dest_file)
-                            copied_files.append(match)
-                            print(f"  → Copied referenced file: {match}")
-    
-    return copied_files
+
+            for match in _find_references(_NOTEBOOK_REFS_RE, content):
+                # Skip URLs
+                if not match.startswith(('http://', 'https://')):
+                    unique_refs.add(match)
+
+    # Resolve each reference relative to the notebook, keeping ones that exist
+    existing_refs = sorted(ref for ref in unique_refs if (notebook_dir / ref).exists())
+
+    # Create each destination directory once, not once per reference
+    for parent in {(output_dir / ref).parent for ref in existing_refs}:
+        parent.mkdir(parents=True, exist_ok=True)
+
+    inputs = []
+    for ref in existing_refs:
+        dest_file = output_dir / ref
+        if not dest_file.exists():
+            _fast_copy(notebook_dir / ref, dest_file)
+            print(f"  → Copied referenced file: {ref}")
+        _record_input(inputs, ref, notebook_dir / ref)
+
+    return inputs
 
 def copy_markdown_referenced_files(content, markdown_dir, output_dir):
-    """Find files referenced in markdown content and copy them to output."""
-    copied_files = []
-    
-    # Regex patterns for finding file references
-    patterns = [
-        r'\[.*?\]\(([^)]+\.(?:pdf|png|jpg|jpeg|gif|svg|mp4|webm|mov))\)',  # Markdown links
-        r'<img.*?src=["\']([^"\']+\.(?:png|jpg|jpeg|gif|svg))["\']',  # HTML img tags
-        r'!\[.*?\]\(([^)]+\.(?:png|jpg|jpeg|gif|svg))\)',  # Markdown images
-        r'<source.*?src=["\']([^"\']+\.(?:mp4|webm|mov))["\']',  # HTML video sources
-        r'<video.*?src=["\']([^"\']+\.(?:mp4|webm|mov))["\']',  # HTML video src
-    ]
-    
-    for pattern in patterns:
-        matches = re.findall(pattern, content, re.IGNORECASE)
-        for match in matches:
-            # Skip URLs
-            if match.startswith('http://') or match.startswith('https://'):
-                continue
-            
-            # Resolve the file path relative to the markdown file
-            source_file = markdown_dir / match
-            if source_file.exists():
-                # Copy to output directory
-                dest_file = output_dir / match
-                dest_file.parent.mkdir(parents=True, exist_ok=True)
-                
-                if not dest_file.exists():
-                    shutil.copy2(source_file, dest_file)
-                    copied_files.append(match)
-                    print(f"  → Copied referenced file: {match}")
-            else:
-                print(f"  ⚠ Referenced file not found: {match}")
-    
-    return copied_files
+    """Find files referenced in markdown content and copy them to output.
+
+    Returns the input records for every reference, so incremental runs
+    can tell when one of them changes.
+    """
+    inputs = []
+
+    for match in _find_references(_MARKDOWN_REFS_RE, content):
+        # Skip URLs
+        if match.startswith('http://') or match.startswith('https://'):
+            continue
+
+        # Resolve the file path relative to the markdown file
+        source_file = markdown_dir / match
+        if source_file.exists():
+            # Copy to output directory
+            dest_file = output_dir / match
+            dest_file.parent.mkdir(parents=True, exist_ok=True)
+
+            if not dest_file.exists():
+                _fast_copy(source_file, dest_file)
+                print(f"  → Copied referenced file: {match}")
+            _record_input(inputs, match, source_file)
+        else:
+            print(f"  ⚠ Referenced file not found: {match}")
+
+    return inputs
 
 def create_slide_thumbnail(pdf_path, output_dir, width=800):
     """Create a thumbnail of the first page of a PDF."""
@@ -536,9 +834,32 @@ def create_slide_thumbnail(pdf_path, output_dir, width=800):
     thumb_name = f"{pdf_name}-thumb.png"
     thumb_path = output_dir / thumb_name
     
-    if thumb_path.exists():
+    # Reuse the existing thumbnail, but only while it's newer than the PDF -
+    # otherwise an edited slide deck would keep its stale preview forever
+    if thumb_path.exists() and thumb_path.stat().st_mtime_ns >= pdf_path.stat().st_mtime_ns:
         return thumb_name
-    
+
+    # Render in-process when pypdfium2 is available - no subprocess startup
+    # cost, and the library init is shared across all slide decks
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        pdfium = None
+
+    if pdfium:
+        try:
+            pdf = pdfium.PdfDocument(str(pdf_path))
+            try:
+                pil_image = pdf[0].render(scale=150 / 72).to_pil()
+                pil_image.thumbnail((width, width * 4))
+                pil_image.save(thumb_path, 'PNG', optimize=True)
+                print(f"  → Created slide thumbnail: {thumb_name}")
+                return thumb_name
+            finally:
+                pdf.close()
+        except Exception:
+            pass
+
     try:
         # Try using ImageMagick's convert command
         cmd = [
@@ -642,9 +963,8 @@ function loadSlides(id, src) {{
 
 def process_markdown(markdown_path, output_dir, config, section_slides=None):
     """Process a markdown file with frontmatter and return info for index."""
-    with open(markdown_path, 'r') as f:
-        content = f.read()
-    
+    content = Path(markdown_path).read_text()
+
     frontmatter, markdown_content = extract_markdown_frontmatter(content)
     if not frontmatter:
         print(f"Skipping {markdown_path} - no frontmatter")
@@ -656,39 +976,51 @@ def process_markdown(markdown_path, output_dir, config, section_slides=None):
     
     base_name = markdown_path.stem
     markdown_dir = markdown_path.parent
+
+    # Unpack the frontmatter fields we touch repeatedly below
     title = frontmatter.get('title', base_name)
+    data_files = frontmatter.get('data_files')
+    slides = frontmatter.get('slides')
+    links = frontmatter.get('links')
     
-    # Copy referenced files (images, videos, etc) from markdown content
-    copy_markdown_referenced_files(markdown_content, markdown_dir, output_dir)
+    # Copy referenced files (images, videos, etc) from markdown content,
+    # keeping their (path, mtime, size) records so incremental runs
+    # notice edits
+    inputs = copy_markdown_referenced_files(markdown_content, markdown_dir, output_dir)
     
     # Create data zip if data files are specified
-    if frontmatter.get('data_files'):
+    if data_files:
         zip_name = f"{base_name}-data.zip"
-        create_data_zip(frontmatter['data_files'], output_dir / zip_name, markdown_dir)
+        create_data_zip(data_files, output_dir / zip_name, markdown_dir)
     
     # Build the full content with title
     full_content = f"# {title}\n\n"
     
     # Generate and add table of contents at the top (after title)
-    has_useful_links = bool(frontmatter.get('links'))
+    has_useful_links = bool(links)
     toc = generate_toc_from_markdown(markdown_content, has_useful_links)
     if toc:
         full_content += toc + "\n"
     
     # Add download link if data files exist
-    if frontmatter.get('data_files'):
+    if data_files:
         zip_name = f"{base_name}-data.zip"
         full_content += f'<div class="download-box">\n<strong>Download files:</strong> <a href="./{zip_name}">📦 {zip_name}</a>\n</div>\n\n'
     
     # Add slides if specified
-    if frontmatter.get('slides'):
-        slide_html = generate_slide_embed(frontmatter['slides'], markdown_dir, output_dir, 'markdown')
+    if slides:
+        slide_html = generate_slide_embed(slides, markdown_dir, output_dir, 'markdown')
         full_content += slide_html + '\n\n'
+        # Same source resolution generate_slide_embed just used
+        source_pdf = markdown_dir / slides
+        if not source_pdf.exists():
+            source_pdf = Path(slides)
+        _record_input(inputs, slides, source_pdf)
     
     # Add links section if present
-    if frontmatter.get('links'):
+    if links:
         full_content += "## Useful Links\n\n"
-        for link in frontmatter['links']:
+        for link in links:
             name = link.get('name', 'Link')
             url = link.get('url', '#')
             desc = link.get('description', '')
@@ -700,12 +1032,11 @@ def process_markdown(markdown_path, output_dir, config, section_slides=None):
     
     full_content += markdown_content
     
-    # Convert to HTML and save
+    # Convert to HTML and save the whole page in one syscall
     html_content = markdown_to_html(full_content, title)
     output_html = output_dir / f"{base_name}.html"
-    with open(output_html, 'w') as f:
-        f.write(html_content)
-    
+    output_html.write_bytes(html_content.encode('utf-8'))
+
     print(f"✓ Created {output_html}")
     
     # Return info for index
@@ -714,14 +1045,41 @@ def process_markdown(markdown_path, output_dir, config, section_slides=None):
         'title': title,
         'description': frontmatter.get('description', ''),
         'html_file': f"{base_name}.html",
-        'data_file': f"{base_name}-data.zip" if frontmatter.get('data_files') else None,
+        'data_file': f"{base_name}-data.zip" if data_files else None,
         'section': markdown_dir.name,
         'type': 'markdown',
         'order': frontmatter.get('order', None),
-        'links': frontmatter.get('links', None),
-        'slides': frontmatter.get('slides', None)
+        'links': links,
+        'slides': slides,
+        'inputs': inputs,
+        'data_patterns': data_files
     }
 
+# Per-item index fragments, parsed once at import and rendered with
+# str.format_map. No blank lines inside the divs: that keeps each one a
+# single raw HTML block for every markdown engine we support
+_NOTEBOOK_ITEM_TMPL = (
+    '<div class="resource-buttons">\n'
+    '<a href="{colab_url}" class="resource-button primary">🚀 Live coding worksheet</a>\n'
+    '<a href="{answers_colab_url}" class="resource-button completed">✓ Completed version</a>\n'
+    '</div>\n\n'
+    '<div class="download-links">\n'
+    '📓 Download: <a href="./{exercise_file}">worksheet</a> | \n'
+    '<a href="./{answers_file}">completed</a><br>\n'
+    '{data_block}</div>\n'
+)
+
+_MARKDOWN_ITEM_TMPL = '<div>\n{data_block}</div>\n'
+
+def _render_link(link):
+    """Render one 'Useful Links' entry as a list item."""
+    name = link.get('name', 'Link')
+    url = link.get('url', '#')
+    desc = link.get('description', '')
+    if desc:
+        return f'<li><a href="{url}">{name}</a> {desc}</li>\n'
+    return f'<li><a href="{url}">{name}</a></li>\n'
+
 def create_index(notebooks, config, output_dir):
     """Create index.html with links to all notebooks."""
     github_repo = config['github_repo']
@@ -743,8 +1101,10 @@ def create_index(notebooks, config, output_dir):
             sections[section] = []
         sections[section].append(nb)
     
-    # Build notebooks markdown
-    notebooks_md = []
+    # Stream the per-section fragments into one buffer, directly as HTML;
+    # they pass through untouched when a user template sends them back
+    # through markdown
+    notebooks_buf = io.StringIO()
     
     # Process sections in the order they appear in config
     section_order = []
@@ -761,7 +1121,7 @@ def create_index(notebooks, config, output_dir):
     
     for section in section_order:
         section_items = sections.get(section, [])
-        notebooks_md.append(f'\n## {section}\n')
+        notebooks_buf.write(f'<h2 id="{_slugify(section)}">{section}</h2>\n\n')
         
         # Add section slides if available
         section_cfg = section_configs.get(section, {})
@@ -769,174 +1129,405 @@ def create_index(notebooks, config, output_dir):
             # Get the first item's folder to determine the section directory
             section_dir = Path(section_items[0]['section_folder']) if section_items else Path('.')
             slide_html = generate_slide_embed(section_cfg['slides'], section_dir.parent, Path(config.get('output_dir', 'docs')), 'index')
-            notebooks_md.append('\n' + slide_html + '\n')
+            notebooks_buf.write(f'\n{slide_html}\n\n')
         
         # Sort items: first by those with order (ascending), then by filename (descending)
-        def sort_key(item):
-            if item['order'] is not None:
-                return (0, item['order'], '')  # Items with order come first
-            else:
-                return (1, 0, item['name'])  # Then items without order
-        
-        sorted_items = sorted(section_items, key=sort_key)
-        # For items without order, we want descending by name
-        items_with_order = [item for item in sorted_items if item['order'] is not None]
-        items_without_order = sorted([item for item in sorted_items if item['order'] is None], 
-                                   key=lambda x: x['name'], reverse=True)
-        sorted_items = items_with_order + items_without_order
+        sorted_items = (
+            sorted((item for item in section_items if item['order'] is not None),
+                   key=lambda item: item['order'])
+            + sorted((item for item in section_items if item['order'] is None),
+                     key=lambda item: item['name'], reverse=True)
+        )
         
         for item in sorted_items:
+            # Unpack the fields the f-strings below reference repeatedly
+            title = item['title']
+            description = item['description']
+            data_file = item['data_file']
+            slides = item.get('slides')
+            section_item_slides = item.get('section_slides')
+            links = item.get('links')
+            is_markdown = item.get('type') == 'markdown'
+
             # Make title a link
-            if item.get('type') == 'markdown':
-                notebooks_md.append(f"### [{item['title']}](./{item['html_file']})\n")
+            if is_markdown:
+                item_url = f"./{item['html_file']}"
             else:
-                colab_url = f"https://colab.research.google.com/github/{github_repo}/blob/{github_branch}/{output_dir_name}/{item['exercise_file']}"
-                notebooks_md.append(f"### [{item['title']}]({colab_url})\n")
-            
-            if item['description']:
-                notebooks_md.append(f"{item['description']}\n")
-            
-            if item.get('type') == 'markdown':
+                exercise_file = item['exercise_file']
+                answers_file = item['answers_file']
+                colab_url = f"https://colab.research.google.com/github/{github_repo}/blob/{github_branch}/{output_dir_name}/{exercise_file}"
+                item_url = colab_url
+            # Spaces are the one URL-hostile character our filenames contain
+            header = f'<h3 id="{_slugify(title)}"><a href="{item_url.replace(" ", "%20")}">{title}</a></h3>\n'
+
+            if description:
+                # Descriptions are user-authored prose, so they do get a
+                # markdown pass
+                header += markdown_to_html_fragment(description)
+
+            if is_markdown:
                 # Handle markdown files
-                notebooks_md.append('<div>\n')
-                # notebooks_md.append(f'📄 View: <a href="./{item["html_file"]}">content</a><br>\n')
-                if item['data_file']:
-                    notebooks_md.append(f'📦 Data: <a href="./{item["data_file"]}">{item["data_file"]}</a><br>\n')
-                notebooks_md.append('</div>\n')
+                if data_file:
+                    data_block = f'📦 Data: <a href="./{data_file}">{data_file}</a><br>\n'
+                else:
+                    data_block = ''
+                content_block = _MARKDOWN_ITEM_TMPL.format_map({'data_block': data_block})
             else:
                 # Handle notebooks
-                colab_url = f"https://colab.research.google.com/github/{github_repo}/blob/{github_branch}/{output_dir_name}/{item['exercise_file']}"
-                answers_colab_url = f"https://colab.research.google.com/github/{github_repo}/blob/{github_branch}/{output_dir_name}/{item['answers_file']}"
-                
-                notebooks_md.append('<div class="resource-buttons">\n')
-                notebooks_md.append(f'<a href="{colab_url}" class="resource-button primary">🚀 Live coding worksheet</a>\n')
-                notebooks_md.append(f'<a href="{answers_colab_url}" class="resource-button completed">✓ Completed version</a>\n')
-                notebooks_md.append('</div>\n')
-                
-                notebooks_md.append('<div class="download-links">\n')
-                notebooks_md.append(f'📓 Download: <a href="./{item["exercise_file"]}">worksheet</a> | ')
-                notebooks_md.append(f'<a href="./{item["answers_file"]}">completed</a><br>\n')
-                if item['data_file']:
-                    notebooks_md.append(f'📦 Data: <a href="./{item["data_file"]}">{item["data_file"]}</a>\n')
-                notebooks_md.append('</div>\n')
-            
+                answers_colab_url = f"https://colab.research.google.com/github/{github_repo}/blob/{github_branch}/{output_dir_name}/{answers_file}"
+                if data_file:
+                    data_block = f'📦 Data: <a href="./{data_file}">{data_file}</a>\n'
+                else:
+                    data_block = ''
+
+                content_block = _NOTEBOOK_ITEM_TMPL.format_map({
+                    'colab_url': colab_url,
+                    'answers_colab_url': answers_colab_url,
+                    'exercise_file': exercise_file,
+                    'answers_file': answers_file,
+                    'data_block': data_block,
+                })
+
+            notebooks_buf.write(header)
+            notebooks_buf.write('\n')
+            notebooks_buf.write(content_block)
+            notebooks_buf.write('\n')
+
             # Add slides mention if present (only item-specific slides, not section slides)
-            if item.get('slides') and not item.get('section_slides'):
-                slide_filename = Path(item["slides"]).name
-                notebooks_md.append(f'<div style="margin: 0.5em 0; color: #666;">📑 Slides: <a href="./{item["slides"]}">{slide_filename}</a></div>\n')
-            
-            # Add links if present
-            if item.get('links'):
-                notebooks_md.append('\n**Links:**\n\n')
-                notebooks_md.append("<ul>")
-                for link in item['links']:
-                    name = link.get('name', 'Link')
-                    url = link.get('url', '#')
-                    desc = link.get('description', '')
-                    if desc:
-                        notebooks_md.append(f'<li><a href="{url}">{name}</a> {desc}</li>\n')
-                    else:
-                        notebooks_md.append(f'<li><a href="{url}">{name}</a></li>\n')
-            notebooks_md.append("</ul>")
-            notebooks_md.append("\n\n")
-            notebooks_md.append("")  # Empty line between items
-    
-    # Use template from config or default
-    template = config.get('index_template', '''# {{ title }}
-
-{{ description }}
-
-{{ notebooks }}
-''')
-    
-    # Replace template variables
-    index_content = template
-    index_content = index_content.replace('{{ title }}', config.get('title', 'Workshop'))
-    index_content = index_content.replace('{{ description }}', config.get('description', ''))
-    index_content = index_content.replace('{{ notebooks }}', '\n'.join(notebooks_md))
-    index_content = index_content.replace('{{ author }}', config.get('author', ''))
-    index_content = index_content.replace('{{ organization }}', config.get('organization', ''))
-    index_content = index_content.replace('{{ newsletter }}', config.get('newsletter_signup', ''))
-    
-    # Convert to HTML and write
-    html_content = markdown_to_html(index_content, config.get('title', 'Workshop'))
-    with open(output_dir / 'index.html', 'w') as f:
-        f.write(html_content)
+            if slides and not section_item_slides:
+                # Plain string op - no Path allocation per item
+                slide_filename = os.path.basename(slides)
+                notebooks_buf.write(f'<div style="margin: 0.5em 0; color: #666;">📑 Slides: <a href="./{slides}">{slide_filename}</a></div>\n\n')
+
+            # Add links if present - one string for the whole list
+            if links:
+                notebooks_buf.write('\n<p><strong>Links:</strong></p>\n\n')
+                notebooks_buf.write('<ul>\n' + ''.join(_render_link(link) for link in links) + '</ul>\n\n')
+
+            notebooks_buf.write('\n\n')  # Empty line between items
     
+    notebooks_html = notebooks_buf.getvalue()
+
+    title = config.get('title', 'Workshop')
+    template = config.get('index_template')
+    if template:
+        # User-supplied templates are markdown prose, so keep the full
+        # round-trip for them; the HTML fragments pass through untouched.
+        # Replace template variables in one pass: rewrite the historical
+        # {{ var }} sentinels to $var and let string.Template do a single scan
+        # instead of copying the whole template once per variable
+        template = _TEMPLATE_VAR_RE.sub(r'$\1', template)
+        index_content = string.Template(template).safe_substitute(
+            title=title,
+            description=config.get('description', ''),
+            notebooks=notebooks_html,
+            author=config.get('author', ''),
+            organization=config.get('organization', ''),
+            newsletter=config.get('newsletter_signup', ''),
+        )
+        html_content = markdown_to_html(index_content, title)
+    else:
+        # Default page: everything above is already HTML, so skip the
+        # markdown round-trip and only parse the user-authored description
+        body = f'<h1>{title}</h1>\n'
+        description = config.get('description', '')
+        if description:
+            body += markdown_to_html_fragment(description)
+        body += notebooks_html
+        html_content = _PAGE_TEMPLATE.substitute(title=title, body=body)
+
+    # Write the whole page in one syscall
+    (output_dir / 'index.html').write_bytes(html_content.encode('utf-8'))
+
     print(f"✓ Created {output_dir / 'index.html'}")
 
+def _load_manifest(manifest_path):
+    """Load the incremental-publish manifest, or start fresh if unreadable."""
+    try:
+        return notebook_json_loads(manifest_path.read_bytes())
+    except (OSError, ValueError):
+        return {}
+
+def _check_manifest_entry(path, files):
+    """Decide whether the cached result for a source file is still valid.
+
+    Returns (entry, stat_result, digest): entry is the manifest entry when
+    the source is unchanged (None otherwise), and digest is the source
+    sha256 if it was computed along the way.
+    """
+    stat_result = path.stat()
+    entry = files.get(str(path))
+    digest = None
+    if entry:
+        if entry['mtime'] == stat_result.st_mtime_ns and entry['size'] == stat_result.st_size:
+            return entry, stat_result, entry['sha256']
+        # mtime moved (fresh checkout, touch...) - compare content instead
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        if entry['sha256'] == digest:
+            return entry, stat_result, digest
+    return None, stat_result, digest
+
+def _manifest_entry(stat_result, digest, item):
+    """Build one manifest record for a source file."""
+    return {'mtime': stat_result.st_mtime_ns, 'size': stat_result.st_size,
+            'sha256': digest, 'item': item}
+
+def _cached_item_usable(item, output_dir):
+    """A cached item only counts while its published files still exist
+    and the slides and referenced files behind them haven't changed.
+
+    Data zips are not checked here: reused items re-run create_data_zip,
+    which skips or rebuilds against its own input manifest.
+    """
+    if item is None:
+        return True  # a source that was skipped before stays skipped
+    names = [item.get('exercise_file'), item.get('answers_file'),
+             item.get('html_file'), item.get('data_file')]
+    if not all((output_dir / name).exists() for name in names if name):
+        return False
+
+    # Slides and referenced files, recorded when they were copied
+    if 'inputs' not in item:
+        return False  # entry from before inputs were tracked; rebuild once
+    source_dir = Path(item.get('section_folder') or '.')
+    for rel, mtime_ns, size in item['inputs']:
+        source = source_dir / rel
+        if not source.exists():
+            source = Path(rel)  # same project-root fallback used when copying
+        try:
+            st = source.stat()
+        except OSError:
+            return False
+        if st.st_mtime_ns != mtime_ns or st.st_size != size:
+            return False
+    return True
+
+def _init_worker(md_cache_enabled, pretty_notebooks):
+    """Seed a worker process with the CLI flags main() resolved.
+
+    The flags live in module globals; workers started via spawn or
+    forkserver re-import the module and would otherwise see the defaults.
+    """
+    global _md_cache_enabled, _pretty_notebooks
+    _md_cache_enabled = md_cache_enabled
+    _pretty_notebooks = pretty_notebooks
+
+class _TaskFailed(RuntimeError):
+    """A task died; str() of it is everything the task printed first."""
+
+def _run_item_task(process, task):
+    """Run one per-item task with its progress output captured.
+
+    The output is returned alongside the item so workers never contend
+    for stdout; the parent logs it once the task completes. If the task
+    fails (including the sys.exit(1) our helpers use for fatal errors),
+    the captured output is re-raised with it so the error isn't lost
+    with the redirected stdout.
+    """
+    path, output_dir, config, section_slides, _, _ = task
+    buf = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buf):
+            print(f"\nProcessing {path}")
+            item_info = process(path, output_dir, config, section_slides)
+    except SystemExit:
+        raise _TaskFailed(buf.getvalue())
+    except Exception:
+        raise _TaskFailed(buf.getvalue() + traceback.format_exc())
+    return item_info, buf.getvalue()
+
+def _process_notebook_task(task):
+    """Process one notebook task tuple - picklable entry point for workers."""
+    return _run_item_task(process_notebook, task)
+
+def _process_markdown_task(task):
+    """Process one markdown task tuple - picklable entry point for workers."""
+    return _run_item_task(process_markdown, task)
+
+def _finish_item(item_info, task):
+    """Attach section info from the task to a processed item."""
+    _, _, _, section_slides, title, folder = task
+    # Override section with configured title
+    item_info['section'] = title
+    item_info['section_folder'] = folder
+    # Add section slides if not overridden
+    if section_slides and not item_info.get('slides'):
+        item_info['section_slides'] = section_slides
+    return item_info
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Section:
+    """One configured section, normalized from the dict-or-string config."""
+    folder: str
+    title: str
+    slides: str | None = None
+
+def _normalize_sections(sections):
+    """Turn the sections config (dicts or bare folder strings) into Sections."""
+    normalized = []
+    for s in sections:
+        if isinstance(s, dict):
+            folder = s.get('folder')
+            normalized.append(Section(folder, s.get('title', folder), s.get('slides')))
+        else:
+            # Handle if sections is a list of strings
+            normalized.append(Section(s, s))
+    return normalized
+
 def main():
     """Process all notebooks and create data packages."""
+    parser = argparse.ArgumentParser(description='Publish workshop notebooks and markdown pages')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Re-render markdown even if a cached version exists')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(),
+                        help='Worker processes for notebook processing (use 1 to disable parallelism)')
+    parser.add_argument('--pretty', action='store_true',
+                        help='Indent published notebook JSON (bigger but diffable)')
+    parser.add_argument('--force', action='store_true',
+                        help='Wipe the output directory and republish everything')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
+
+    global _md_cache_enabled, _pretty_notebooks
+    _md_cache_enabled = not args.no_cache
+    _pretty_notebooks = args.pretty
+
     config = load_config()
     output_dir = Path(config.get('output_dir', 'docs'))
-    
-    # Clean up old publish directory
-    if output_dir.exists():
-        import shutil
-        shutil.rmtree(output_dir)
-        print(f"✓ Cleaned up old {output_dir}/ directory")
-    
+
+    # Start from scratch when asked; otherwise publish incrementally on top
+    # of the previous run, guided by the manifest kept in the output dir.
+    # Deleting docs/ can take a while, so move it aside instantly and let
+    # the actual delete overlap with the real work
+    cleanup_thread = None
+    if args.force and output_dir.exists():
+        old_dir = output_dir.with_name(f"{output_dir.name}.old.{os.getpid()}")
+        os.rename(output_dir, old_dir)
+        cleanup_thread = threading.Thread(target=shutil.rmtree, args=(old_dir,))
+        cleanup_thread.start()
+        logger.info(f"✓ Cleaning up old {output_dir}/ directory in the background")
+
     output_dir.mkdir(exist_ok=True)
+
+    manifest_path = output_dir / '.publish-manifest.json'
+    manifest = {} if args.force else _load_manifest(manifest_path)
+
+    # Any config change (repo, branch, template...) invalidates everything
+    config_digest = hashlib.sha256(
+        json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()
+    if manifest.get('config') != config_digest:
+        manifest = {}
     
     # Look for notebooks and markdown files in configured sections
     sections = config.get('sections', [])
     if not sections:
-        print("Warning: No sections defined in workshop-config.yaml")
+        logger.warning("Warning: No sections defined in workshop-config.yaml")
+        if cleanup_thread:
+            cleanup_thread.join()
         return
     
-    processed_items = []
-    
-    for section in sections:
-        if isinstance(section, dict):
-            folder = section.get('folder')
-            title = section.get('title', folder)
-            section_slides = section.get('slides')
-        else:
-            # Handle if sections is a list of strings
-            folder = section
-            title = section
-            section_slides = None
-            
-        if not folder or not Path(folder).exists():
-            print(f"Warning: Section folder '{folder}' not found")
+    # Collect everything to process first - each notebook is independent,
+    # so the actual processing can fan out across worker processes
+    notebook_tasks = []
+    markdown_tasks = []
+
+    for section in _normalize_sections(sections):
+        folder = section.folder
+        title = section.title
+        section_slides = section.slides
+
+        # os.path.isdir is a single stat with no Path allocation, and also
+        # rejects a regular file masquerading as a section folder
+        if not folder or not os.path.isdir(folder):
+            logger.warning(f"Warning: Section folder '{folder}' not found")
             continue
-            
-        # Process notebooks
-        for notebook_path in Path(folder).glob('*.ipynb'):
-            # Skip checkpoints
-            if '.ipynb_checkpoints' in str(notebook_path):
+
+        # List the folder once and route by suffix, rather than globbing
+        # the same directory separately for notebooks and markdown
+        folder_path = Path(folder)
+        with os.scandir(folder_path) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+
+        for entry in entries:
+            # Skip hidden files and checkpoint clutter
+            if entry.name.startswith('.') or not entry.is_file():
                 continue
-            
-            print(f"\nProcessing {notebook_path}")
-            notebook_info = process_notebook(notebook_path, output_dir, config, section_slides)
-            if notebook_info:
-                # Override section with configured title
-                notebook_info['section'] = title
-                notebook_info['section_folder'] = folder
-                # Add section slides if not overridden
-                if section_slides and not notebook_info.get('slides'):
-                    notebook_info['section_slides'] = section_slides
-                processed_items.append(notebook_info)
-        
-        # Process markdown files
-        for markdown_path in Path(folder).glob('*.md'):
-            print(f"\nProcessing {markdown_path}")
-            markdown_info = process_markdown(markdown_path, output_dir, config, section_slides)
-            if markdown_info:
-                # Override section with configured title
-                markdown_info['section'] = title
-                markdown_info['section_folder'] = folder
-                # Add section slides if not overridden
-                if section_slides and not markdown_info.get('slides'):
-                    markdown_info['section_slides'] = section_slides
-                processed_items.append(markdown_info)
-    
-    # Create index.html
+            if entry.name.endswith('.ipynb'):
+                notebook_tasks.append((folder_path / entry.name, output_dir, config, section_slides, title, folder))
+            elif entry.name.endswith('.md'):
+                markdown_tasks.append((folder_path / entry.name, output_dir, config, section_slides, title, folder))
+
+    processed_items = []
+    files = manifest.get('files', {})
+    new_files = {}
+
+    # Split tasks into ones whose cached result is still good and ones
+    # that actually need processing
+    stale_notebooks = []
+    stale_markdown = []
+    for tasks, stale in ((notebook_tasks, stale_notebooks), (markdown_tasks, stale_markdown)):
+        for task in tasks:
+            entry, stat_result, digest = _check_manifest_entry(task[0], files)
+            if entry is not None and _cached_item_usable(entry['item'], output_dir):
+                logger.info(f"✓ Reusing {task[0]} (unchanged)")
+                item = entry['item']
+                if item:
+                    # Data zips validate their own inputs; re-running this
+                    # also picks up new files matching the patterns
+                    if item.get('data_file') and item.get('data_patterns'):
+                        create_data_zip(item['data_patterns'],
+                                        output_dir / item['data_file'], Path(task[5]))
+                    processed_items.append(item)
+                new_files[str(task[0])] = _manifest_entry(stat_result, digest, item)
+            else:
+                stale.append((task, stat_result, digest))
+
+    # Process whatever is stale - notebooks and markdown fan out over the
+    # same pool, since every item writes its own independent outputs
+    stale_all = ([(rec, _process_notebook_task) for rec in stale_notebooks]
+                 + [(rec, _process_markdown_task) for rec in stale_markdown])
+
+    results = []
+    try:
+        if args.jobs > 1 and len(stale_all) > 1:
+            with ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker,
+                                     initargs=(_md_cache_enabled, _pretty_notebooks)) as executor:
+                futures = {executor.submit(worker, rec[0]): rec for rec, worker in stale_all}
+                for future in as_completed(futures):
+                    results.append((futures[future], future.result()))
+        else:
+            results = [(rec, worker(rec[0])) for rec, worker in stale_all]
+    except _TaskFailed as failure:
+        # Surface whatever the failed task printed before it died
+        logger.error(str(failure).rstrip('\n'))
+        sys.exit(1)
+
+    for (task, stat_result, digest), (item_info, log_text) in results:
+        if log_text:
+            logger.info(log_text.rstrip('\n'))
+        item = _finish_item(item_info, task) if item_info else None
+        if item:
+            processed_items.append(item)
+        if digest is None:
+            digest = hashlib.sha256(task[0].read_bytes()).hexdigest()
+        new_files[str(task[0])] = _manifest_entry(stat_result, digest, item)
+    
+    # Create index.html - always, since it's cheap next to the per-item work
     if processed_items:
-        print("\nCreating index.html...")
+        logger.info("\nCreating index.html...")
         create_index(processed_items, config, output_dir)
-    
-    print(f"\n✓ Published {len(processed_items)} items to {output_dir}/")
+
+    # Persist the manifest for the next incremental run
+    tmp = manifest_path.with_suffix('.tmp')
+    tmp.write_bytes(_json_dumps_compact({'config': config_digest, 'files': new_files}))
+    tmp.replace(manifest_path)
+
+    # Don't exit while the old output tree is still being deleted
+    if cleanup_thread:
+        cleanup_thread.join()
+
+    logger.info(f"\n✓ Published {len(processed_items)} items to {output_dir}/")
 
 if __name__ == '__main__':
     main()
\ No newline at end of file